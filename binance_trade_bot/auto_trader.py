@@ -1,13 +1,50 @@
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 from .binance_api_manager import BinanceAPIManager
 from .config import Config
 from .database import Database
 from .logger import Logger
-from .models import Coin, CoinValue, Pair
+from .models import Coin, CoinValue, Interval, Pair
+
+
+class PairTable:  # pylint: disable=too-few-public-methods
+    """
+    Snapshot of the enabled pairs from a coin, stored as parallel lists and arrays so scouting computes over all
+    pairs at once. The ORM pairs and coins are only kept to log scouts and look up fees
+    """
+
+    def __init__(self, pairs: List[Pair], get_bridge_symbol: Callable[[Coin], str]):
+        self.pairs = pairs
+        self.to_coins: List[Coin] = [pair.to_coin for pair in pairs]
+        self.to_symbols: List[str] = [get_bridge_symbol(to_coin) for to_coin in self.to_coins]
+        self.ratios = np.array([pair.ratio for pair in pairs], dtype=np.float64)
+
+
+def scout_kernel(
+    ratios: np.ndarray,
+    optional_coin_prices: np.ndarray,
+    coin_price: float,
+    from_fee: float,
+    to_fees: np.ndarray,
+    use_margin: bool,
+    scout_margin: float,
+    scout_multiplier: float,
+) -> np.ndarray:
+    """
+    Compute how much better than its threshold jumping to each optional coin is, viable jumps are above zero
+    """
+    # Obtain (current coin)/(optional coin)
+    coin_opt_coin_ratio = coin_price / optional_coin_prices
+
+    transaction_fee = from_fee + to_fees - from_fee * to_fees
+
+    if use_margin:
+        return (1 - transaction_fee) * coin_opt_coin_ratio / ratios - 1 - scout_margin / 100
+    return (coin_opt_coin_ratio - transaction_fee * scout_multiplier * coin_opt_coin_ratio) - ratios
 
 
 class AutoTrader:
@@ -22,6 +59,9 @@ class AutoTrader:
         self.db = database
         self.logger = logger
         self.config = config
+        self._pair_tables_cache: Dict[str, PairTable] = {}
+        self._enabled_coins_cache: Optional[List[Coin]] = None
+        self._trade_symbols_cache: Optional[List[str]] = None
 
     def initialize(self):
         self.initialize_trade_thresholds()
@@ -32,7 +72,7 @@ class AutoTrader:
         """
         can_sell = False
         balance = self.manager.get_currency_balance(pair.from_coin.symbol)
-        from_coin_price = self.manager.get_ticker_price(pair.from_coin + self.config.BRIDGE)
+        from_coin_price = self.manager.get_ticker_price(self.manager.get_bridge_symbol(pair.from_coin))
 
         if balance and balance * from_coin_price > self.manager.get_min_notional(
             pair.from_coin.symbol, self.config.BRIDGE.symbol
@@ -60,19 +100,30 @@ class AutoTrader:
         """
 
         if coin_price is None:
-            self.logger.info(f"Skipping update... current coin {coin + self.config.BRIDGE} not found")
+            self.logger.info(f"Skipping update... current coin {self.manager.get_bridge_symbol(coin)} not found")
             return
 
         session: Session
         with self.db.db_session() as session:
-            for pair in session.query(Pair).filter(Pair.to_coin == coin):
-                from_coin_price = self.manager.get_ticker_price(pair.from_coin + self.config.BRIDGE)
+            from_symbols = {
+                pair_id: self.manager.get_bridge_symbol(from_coin_id)
+                for pair_id, from_coin_id in session.query(Pair.id, Pair.from_coin_id).filter(Pair.to_coin == coin)
+            }
+            tickers = self.manager.get_all_tickers_dict(list(from_symbols.values()))
+
+            ratios = []
+            for pair_id, from_symbol in from_symbols.items():
+                from_coin_price = tickers.get(from_symbol)
 
                 if from_coin_price is None:
-                    self.logger.info(f"Skipping update for coin {pair.from_coin + self.config.BRIDGE} not found")
+                    self.logger.info(f"Skipping update for coin {from_symbol} not found")
                     continue
 
-                pair.ratio = from_coin_price / coin_price
+                ratios.append({"id": pair_id, "ratio": from_coin_price / coin_price})
+
+            session.bulk_update_mappings(Pair, ratios)
+
+        self.invalidate_pairs_cache()
 
     def initialize_trade_thresholds(self):
         """
@@ -80,22 +131,34 @@ class AutoTrader:
         """
         session: Session
         with self.db.db_session() as session:
-            for pair in session.query(Pair).filter(Pair.ratio.is_(None)).all():
-                if not pair.from_coin.enabled or not pair.to_coin.enabled:
-                    continue
+            pairs: List[Pair] = session.query(Pair).filter(Pair.ratio.is_(None), Pair.enabled.is_(True)).all()
+            tickers = self.manager.get_all_tickers_dict(
+                list(
+                    {self.manager.get_bridge_symbol(coin) for pair in pairs for coin in (pair.from_coin, pair.to_coin)}
+                )
+            )
+
+            ratios = []
+            for pair in pairs:
                 self.logger.info(f"Initializing {pair.from_coin} vs {pair.to_coin}")
 
-                from_coin_price = self.manager.get_ticker_price(pair.from_coin + self.config.BRIDGE)
+                from_symbol = self.manager.get_bridge_symbol(pair.from_coin)
+                from_coin_price = tickers.get(from_symbol)
                 if from_coin_price is None:
-                    self.logger.info(f"Skipping initializing {pair.from_coin + self.config.BRIDGE}, symbol not found")
+                    self.logger.info(f"Skipping initializing {from_symbol}, symbol not found")
                     continue
 
-                to_coin_price = self.manager.get_ticker_price(pair.to_coin + self.config.BRIDGE)
+                to_symbol = self.manager.get_bridge_symbol(pair.to_coin)
+                to_coin_price = tickers.get(to_symbol)
                 if to_coin_price is None:
-                    self.logger.info(f"Skipping initializing {pair.to_coin + self.config.BRIDGE}, symbol not found")
+                    self.logger.info(f"Skipping initializing {to_symbol}, symbol not found")
                     continue
 
-                pair.ratio = from_coin_price / to_coin_price
+                ratios.append({"id": pair.id, "ratio": from_coin_price / to_coin_price})
+
+            session.bulk_update_mappings(Pair, ratios)
+
+        self.invalidate_pairs_cache()
 
     def scout(self):
         """
@@ -103,68 +166,142 @@ class AutoTrader:
         """
         raise NotImplementedError()
 
-    def _get_ratios(self, coin: Coin, coin_price):
+    def invalidate_pairs_cache(self):
         """
-        Given a coin, get the current price ratio for every other enabled coin
+        Drop the cached pairs, to be called whenever pair ratios change
         """
-        ratio_dict: Dict[Pair, float] = {}
+        self._pair_tables_cache.clear()
 
-        for pair in self.db.get_pairs_from(coin):
-            optional_coin_price = self.manager.get_ticker_price(pair.to_coin + self.config.BRIDGE)
+    def invalidate_coins_cache(self):
+        """
+        Drop the cached coins, symbols and pairs, to be called whenever the enabled coins change
+        """
+        self._enabled_coins_cache = None
+        self._trade_symbols_cache = None
+        self.invalidate_pairs_cache()
 
-            if optional_coin_price is None:
-                self.logger.info(f"Skipping scouting... optional coin {pair.to_coin + self.config.BRIDGE} not found")
-                continue
+    def _get_pair_table(self, coin: Coin) -> PairTable:
+        """
+        Get a snapshot of the enabled pairs from a coin
+        """
+        pair_table = self._pair_tables_cache.get(coin.symbol)
+        if pair_table is None:
+            pair_table = PairTable(self.db.get_pairs_from(coin), self.manager.get_bridge_symbol)
+            self._pair_tables_cache[coin.symbol] = pair_table
+        return pair_table
 
-            self.db.log_scout(pair, pair.ratio, coin_price, optional_coin_price)
+    def _get_enabled_coins(self) -> List[Coin]:
+        """
+        Get every enabled coin
+        """
+        if self._enabled_coins_cache is None:
+            self._enabled_coins_cache = self.db.get_coins()
+        return self._enabled_coins_cache
 
-            # Obtain (current coin)/(optional coin)
-            coin_opt_coin_ratio = coin_price / optional_coin_price
+    def _get_trade_symbols(self) -> List[str]:
+        """
+        Get the bridge symbols of every enabled coin
+        """
+        if self._trade_symbols_cache is None:
+            self._trade_symbols_cache = [self.manager.get_bridge_symbol(coin) for coin in self._get_enabled_coins()]
+        return self._trade_symbols_cache
 
-            # Fees
-            from_fee = self.manager.get_fee(pair.from_coin, self.config.BRIDGE, True)
-            to_fee = self.manager.get_fee(pair.to_coin, self.config.BRIDGE, False)
-            transaction_fee = from_fee + to_fee - from_fee * to_fee
+    def _get_trade_tickers(self) -> Dict[str, float]:
+        """
+        Get a snapshot of the ticker prices of every enabled coin against the bridge
+        """
+        return self.manager.get_all_tickers_dict(self._get_trade_symbols())
 
-            if self.config.USE_MARGIN == "yes":
-                ratio_dict[pair] = (
-                    (1 - transaction_fee) * coin_opt_coin_ratio / pair.ratio - 1 - self.config.SCOUT_MARGIN / 100
-                )
-            else:
-                ratio_dict[pair] = (
-                    coin_opt_coin_ratio - transaction_fee * self.config.SCOUT_MULTIPLIER * coin_opt_coin_ratio
-                ) - pair.ratio
-        return ratio_dict
+    def _get_ratios(self, coin: Coin, coin_price: float, tickers: Optional[Dict[str, float]] = None):
+        """
+        Given a coin, get the current price ratio for every other enabled coin
+        """
+        if tickers is None:
+            tickers = self._get_trade_tickers()
+        pairs, values = self._get_ratio_values(coin, coin_price, tickers)
+        return dict(zip(pairs, values.tolist()))
+
+    def _get_ratio_values(
+        self, coin: Coin, coin_price: float, tickers: Dict[str, float]
+    ) -> Tuple[List[Pair], np.ndarray]:
+        """
+        Same as _get_ratios, but returns the scouted pairs along with an array of their ratios
+        """
+        pair_table = self._get_pair_table(coin)
+        indexes: List[int] = []
+        optional_coin_prices: List[float] = []
+
+        for i, to_symbol in enumerate(pair_table.to_symbols):
+            optional_coin_price = tickers.get(to_symbol)
 
-    def _jump_to_best_coin(self, coin: Coin, coin_price: float):
+            if optional_coin_price is None:
+                self.logger.info(f"Skipping scouting... optional coin {to_symbol} not found")
+                continue
+
+            # pairs without a ratio are NaN in the array, log them without one as before
+            ratio = float(pair_table.ratios[i])
+            self.db.log_scout(pair_table.pairs[i], None if np.isnan(ratio) else ratio, coin_price, optional_coin_price)
+
+            indexes.append(i)
+            optional_coin_prices.append(optional_coin_price)
+
+        if not indexes:
+            return [], np.empty(0)
+
+        # Fees, every pair sells the same coin so the selling fee is shared
+        from_fee = self.manager.get_fee(coin, self.config.BRIDGE, True)
+        to_fees = np.fromiter(
+            (self.manager.get_fee(pair_table.to_coins[i], self.config.BRIDGE, False) for i in indexes),
+            dtype=np.float64,
+            count=len(indexes),
+        )
+
+        values = scout_kernel(
+            pair_table.ratios[indexes],
+            np.array(optional_coin_prices, dtype=np.float64),
+            coin_price,
+            from_fee,
+            to_fees,
+            self.config.USE_MARGIN == "yes",
+            self.config.SCOUT_MARGIN,
+            self.config.SCOUT_MULTIPLIER,
+        )
+
+        return [pair_table.pairs[i] for i in indexes], values
+
+    def _jump_to_best_coin(self, coin: Coin, coin_price: float, tickers: Optional[Dict[str, float]] = None):
         """
         Given a coin, search for a coin to jump to
         """
-        ratio_dict = self._get_ratios(coin, coin_price)
+        if tickers is None:
+            tickers = self._get_trade_tickers()
+        pairs, values = self._get_ratio_values(coin, coin_price, tickers)
 
-        # keep only ratios bigger than zero
-        ratio_dict = {k: v for k, v in ratio_dict.items() if v > 0}
+        # only ratios bigger than zero are viable, masking also discards pairs without a ratio (NaN)
+        viable = np.where(values > 0, values, 0.0)
 
         # if we have any viable options, pick the one with the biggest ratio
-        if ratio_dict:
-            best_pair = max(ratio_dict, key=ratio_dict.get)
+        if viable.any():
+            best_pair = pairs[int(np.argmax(viable))]
             self.logger.info(f"Will be jumping from {coin} to {best_pair.to_coin_id}")
-            self.transaction_through_bridge(best_pair)
+            return self.transaction_through_bridge(best_pair)
+        return None
 
     def bridge_scout(self):
         """
         If we have any bridge coin leftover, buy a coin with it that we won't immediately trade out of
         """
         bridge_balance = self.manager.get_currency_balance(self.config.BRIDGE.symbol)
+        tickers = self._get_trade_tickers()
 
-        for coin in self.db.get_coins():
-            current_coin_price = self.manager.get_ticker_price(coin + self.config.BRIDGE)
+        for coin in self._get_enabled_coins():
+            current_coin_price = tickers.get(self.manager.get_bridge_symbol(coin))
 
             if current_coin_price is None:
                 continue
 
-            ratio_dict = self._get_ratios(coin, current_coin_price)
-            if not any(v > 0 for v in ratio_dict.values()):
+            _, values = self._get_ratio_values(coin, current_coin_price, tickers)
+            if not (values > 0).any():
                 # There will only be one coin where all the ratios are negative. When we find it, buy it if we can
                 if bridge_balance > self.manager.get_min_notional(coin.symbol, self.config.BRIDGE.symbol):
                     self.logger.info(f"Will be purchasing {coin} using bridge coin")
@@ -177,16 +314,37 @@ class AutoTrader:
         Log current value state of all altcoin balances against BTC and USDT in DB.
         """
         now = datetime.now()
+        # Rows are inserted from plain mappings, models are only built when there is a client to send them to
+        send_updates = self.db.socketio_connect()
 
         session: Session
         with self.db.db_session() as session:
             coins: List[Coin] = session.query(Coin).all()
-            for coin in coins:
-                balance = self.manager.get_currency_balance(coin.symbol)
-                if balance == 0:
-                    continue
-                usd_value = self.manager.get_ticker_price(coin + "USDT")
-                btc_value = self.manager.get_ticker_price(coin + "BTC")
-                cv = CoinValue(coin, balance, usd_value, btc_value, datetime=now)
-                session.add(cv)
-                self.db.send_update(cv)
+            balances = self.manager.get_all_balances([coin.symbol for coin in coins])
+            coins = [coin for coin in coins if balances[coin.symbol] != 0]
+            tickers = self.manager.get_all_tickers_dict([coin + quote for coin in coins for quote in ("USDT", "BTC")])
+            session.bulk_insert_mappings(
+                CoinValue,
+                [
+                    {
+                        "coin_id": coin.symbol,
+                        "balance": balances[coin.symbol],
+                        "usd_price": tickers.get(coin + "USDT"),
+                        "btc_price": tickers.get(coin + "BTC"),
+                        "interval": Interval.MINUTELY,
+                        "datetime": now,
+                    }
+                    for coin in coins
+                ],
+            )
+            cvs = []
+            if send_updates:
+                cvs = [
+                    CoinValue(
+                        coin, balances[coin.symbol], tickers.get(coin + "USDT"), tickers.get(coin + "BTC"), datetime=now
+                    )
+                    for coin in coins
+                ]
+
+        for cv in cvs:
+            self.db.send_update(cv)
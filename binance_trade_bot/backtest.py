@@ -1,7 +1,7 @@
 from collections import defaultdict
 from datetime import datetime, timedelta
 from traceback import format_exc
-from typing import Dict
+from typing import Dict, List
 
 from sqlitedict import SqliteDict
 
@@ -62,12 +62,33 @@ class MockBinanceManager(BinanceAPIManager):
             val = cache.get(key, None)
         return val
 
+    def get_all_tickers_dict(self, symbols: List[str] = None) -> Dict[str, float]:
+        """
+        Get the ticker prices of the given symbols, or of all supported coins against the bridge
+        """
+        if symbols is None:
+            symbols = [self.get_bridge_symbol(coin) for coin in self.db.get_coins()]
+        tickers = {}
+        for ticker_symbol in symbols:
+            price = self.get_ticker_price(ticker_symbol)
+            if price is not None:
+                tickers[ticker_symbol] = price
+        return tickers
+
     def get_currency_balance(self, currency_symbol: str, force=False):
         """
         Get balance of a specific coin
         """
         return self.balances.get(currency_symbol, 0)
 
+    def get_all_balances(self, currency_symbols: List[str] = None) -> Dict[str, float]:
+        """
+        Get balances of all coins, or only of the given coins
+        """
+        if currency_symbols is None:
+            return dict(self.balances)
+        return {symbol: self.balances.get(symbol, 0) for symbol in currency_symbols}
+
     def buy_alt(self, origin_coin: Coin, target_coin: Coin):
         origin_symbol = origin_coin.symbol
         target_symbol = target_coin.symbol
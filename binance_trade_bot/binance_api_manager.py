@@ -1,11 +1,16 @@
 import math
+import threading
 import time
 import traceback
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Union
 
+import requests
 from binance.client import Client
 from binance.exceptions import BinanceAPIException
 from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .binance_stream_manager import BinanceCache, BinanceOrder, BinanceStreamManager, OrderGuard
 from .config import Config
@@ -13,20 +18,99 @@ from .database import Database
 from .logger import Logger
 from .models import Coin
 
+# Fall back to REST when the ticker stream hasn't pushed any price for this many seconds
+TICKER_STREAM_TIMEOUT = 60
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many REST requests can be made per second
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Wait until a request can be made and take a token for it
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    # no tokens accumulate while blocked, the bucket starts refilling once the block is over
+                    self._condition.wait(self._blocked_until - now)
+                    continue
+
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                self._condition.wait((1 - self._tokens) / self.rate)
+
+    def block(self, seconds: float):
+        """
+        Drain the bucket and stop handing out tokens for the given amount of seconds
+        """
+        with self._condition:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._last_refill = max(self._last_refill, self._blocked_until)
+            self._tokens = 0.0
+
+
+class BinanceClient(Client):
+    """
+    Binance client that throttles every REST request through a shared RateLimiter, and backs off when Binance
+    reports that the request rate limit was hit. Requests share a pool of keep-alive connections, and idempotent
+    ones are retried on connection errors.
+    """
+
+    def __init__(self, *args, rate_limiter: RateLimiter, **kwargs):
+        # set before initializing the client, as it already calls the `ping` endpoint
+        self.rate_limiter = rate_limiter
+        super().__init__(*args, **kwargs)
+
+    def _init_session(self) -> requests.Session:
+        session = super()._init_session()
+        # Retry-After responses (429) are left to the rate limiter instead of being retried here
+        retries = Retry(total=3, backoff_factor=0.2, respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_maxsize=10, max_retries=retries)
+        session.mount("https://", adapter)
+        return session
+
+    def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
+        self.rate_limiter.acquire()
+        try:
+            return super()._request(method, uri, signed, force_params, **kwargs)
+        except BinanceAPIException as e:
+            # 429: rate limit exceeded, 418: IP banned for repeatedly exceeding it
+            if e.status_code in (418, 429):
+                self.rate_limiter.block(float(e.response.headers.get("Retry-After", 60)))
+            raise
+
 
 class BinanceAPIManager:
     def __init__(self, config: Config, db: Database, logger: Logger, testnet = False):
         # initializing the client class calls `ping` API endpoint, verifying the connection
-        self.binance_client = Client(
+        self.binance_client = BinanceClient(
             config.BINANCE_API_KEY,
             config.BINANCE_API_SECRET_KEY,
             tld=config.BINANCE_TLD,
             testnet=testnet,
+            rate_limiter=RateLimiter(rate=1200 / 60, burst=1200),
         )
         self.db = db
         self.logger = logger
         self.config = config
         self.testnet = testnet
+        self._bridge_symbols_cache: Dict[str, str] = {}
 
         self.cache = BinanceCache()
         self.stream_manager: Optional[BinanceStreamManager] = None
@@ -40,6 +124,17 @@ class BinanceAPIManager:
             self.logger,
         )
 
+    def get_bridge_symbol(self, coin: Union[Coin, str]) -> str:
+        """
+        Get the symbol of a coin against the bridge, e.g. BTCUSDT
+        """
+        coin_symbol = coin.symbol if isinstance(coin, Coin) else coin
+        bridge_symbol = self._bridge_symbols_cache.get(coin_symbol)
+        if bridge_symbol is None:
+            bridge_symbol = coin_symbol + self.config.BRIDGE.symbol
+            self._bridge_symbols_cache[coin_symbol] = bridge_symbol
+        return bridge_symbol
+
     @cached(cache=TTLCache(maxsize=1, ttl=43200))
     def get_trade_fees(self) -> Dict[str, float]:
         if not self.testnet:
@@ -59,6 +154,10 @@ class BinanceAPIManager:
     def get_using_bnb_for_fees(self):
         return self.binance_client.get_bnb_burn_spot_margin()["spotBNBBurn"]
 
+    @cached(
+        cache=TTLCache(maxsize=2000, ttl=60),
+        key=lambda self, origin_coin, target_coin, selling: hashkey(origin_coin.symbol, target_coin.symbol, selling),
+    )
     def get_fee(self, origin_coin: Coin, target_coin: Coin, selling: bool):
         base_fee = self.get_trade_fees()[origin_coin + target_coin]
         if not self.testnet:
@@ -93,23 +192,87 @@ class BinanceAPIManager:
         """
         return self.binance_client.get_account()
 
+    def _fetch_all_ticker_prices(self):
+        """
+        Refresh the ticker cache with the prices of every symbol in a single request
+        """
+        self.cache.ticker_values = {
+            ticker["symbol"]: float(ticker["price"]) for ticker in self.binance_client.get_symbol_ticker()
+        }
+        self.cache.ticker_values_updated = time.time()
+        self.logger.debug(f"Fetched all ticker prices: {self.cache.ticker_values}")
+
+    def _ticker_values_stale(self):
+        return time.time() - self.cache.ticker_values_updated > TICKER_STREAM_TIMEOUT
+
+    def get_all_tickers_dict(self, symbols: List[str] = None) -> Dict[str, float]:
+        """
+        Get a snapshot of the ticker prices of all symbols, or only of the given symbols.
+        The snapshot of all symbols is shared with the cache and must not be modified.
+        """
+        if symbols is None:
+            if not self.cache.ticker_values or self._ticker_values_stale():
+                self._fetch_all_ticker_prices()
+            return self.cache.ticker_values
+
+        missing = [
+            symbol
+            for symbol in symbols
+            if symbol not in self.cache.ticker_values and symbol not in self.cache.non_existent_tickers
+        ]
+        if missing or self._ticker_values_stale():
+            self._fetch_all_ticker_prices()
+            for symbol in missing:
+                if symbol not in self.cache.ticker_values:
+                    self.logger.info(f"Ticker does not exist: {symbol} - will not be fetched from now on")
+                    self.cache.non_existent_tickers.add(symbol)
+
+        ticker_values = self.cache.ticker_values
+        return {symbol: ticker_values[symbol] for symbol in symbols if symbol in ticker_values}
+
     def get_ticker_price(self, ticker_symbol: str):
         """
         Get ticker price of a specific coin
         """
         price = self.cache.ticker_values.get(ticker_symbol, None)
-        if price is None and ticker_symbol not in self.cache.non_existent_tickers:
-            self.cache.ticker_values = {
-                ticker["symbol"]: float(ticker["price"]) for ticker in self.binance_client.get_symbol_ticker()
-            }
-            self.logger.debug(f"Fetched all ticker prices: {self.cache.ticker_values}")
+        if self._ticker_values_stale() or (price is None and ticker_symbol not in self.cache.non_existent_tickers):
+            self._fetch_all_ticker_prices()
             price = self.cache.ticker_values.get(ticker_symbol, None)
-            if price is None:
+            if price is None and ticker_symbol not in self.cache.non_existent_tickers:
                 self.logger.info(f"Ticker does not exist: {ticker_symbol} - will not be fetched from now on")
                 self.cache.non_existent_tickers.add(ticker_symbol)
 
         return price
 
+    def _fetch_all_balances(self, cache_balances: Dict[str, float]):
+        """
+        Refresh the balance cache with the balances of every asset in a single request
+        """
+        cache_balances.clear()
+        cache_balances.update(
+            {
+                currency_balance["asset"]: float(currency_balance["free"])
+                for currency_balance in self.binance_client.get_account()["balances"]
+            }
+        )
+        self.logger.debug(f"Fetched all balances: {cache_balances}")
+
+    def get_all_balances(self, currency_symbols: List[str] = None) -> Dict[str, float]:
+        """
+        Get a snapshot of the balances of all assets, or only of the given assets
+        """
+        with self.cache.open_balances() as cache_balances:
+            if currency_symbols is None:
+                if not cache_balances:
+                    self._fetch_all_balances(cache_balances)
+                return dict(cache_balances)
+
+            if any(symbol not in cache_balances for symbol in currency_symbols):
+                self._fetch_all_balances(cache_balances)
+                for symbol in currency_symbols:
+                    cache_balances.setdefault(symbol, 0.0)
+            return {symbol: cache_balances[symbol] for symbol in currency_symbols}
+
     def get_currency_balance(self, currency_symbol: str, force=False) -> float:
         """
         Get balance of a specific coin
@@ -117,14 +280,7 @@ class BinanceAPIManager:
         with self.cache.open_balances() as cache_balances:
             balance = cache_balances.get(currency_symbol, None)
             if force or balance is None:
-                cache_balances.clear()
-                cache_balances.update(
-                    {
-                        currency_balance["asset"]: float(currency_balance["free"])
-                        for currency_balance in self.binance_client.get_account()["balances"]
-                    }
-                )
-                self.logger.debug(f"Fetched all balances: {cache_balances}")
+                self._fetch_all_balances(cache_balances)
                 if currency_symbol not in cache_balances:
                     cache_balances[currency_symbol] = 0.0
                     return 0.0
@@ -143,10 +299,20 @@ class BinanceAPIManager:
                 time.sleep(1)
         return None
 
+    @cached(cache=TTLCache(maxsize=1, ttl=43200))
+    def get_symbols_info(self) -> Dict[str, dict]:
+        """
+        Get the exchange information of every symbol, fetched in a single request
+        """
+        return {symbol["symbol"]: symbol for symbol in self.binance_client.get_exchange_info()["symbols"]}
+
+    def get_symbol_info(self, symbol: str) -> Optional[dict]:
+        return self.get_symbols_info().get(symbol)
+
     def get_symbol_filter(self, origin_symbol: str, target_symbol: str, filter_type: str):
         return next(
             _filter
-            for _filter in self.binance_client.get_symbol_info(origin_symbol + target_symbol)["filters"]
+            for _filter in self.get_symbol_info(origin_symbol + target_symbol)["filters"]
             if _filter["filterType"] == filter_type
         )
 
@@ -275,7 +441,7 @@ class BinanceAPIManager:
 
         origin_balance = self.get_currency_balance(origin_symbol)
         target_balance = self.get_currency_balance(target_symbol)
-        pair_info = self.binance_client.get_symbol_info(origin_symbol + target_symbol)
+        pair_info = self.get_symbol_info(origin_symbol + target_symbol)
         from_coin_price = self.get_ticker_price(origin_symbol + target_symbol)
         from_coin_price_s = "{:0.0{}f}".format(from_coin_price, pair_info["quotePrecision"])
 
@@ -338,7 +504,7 @@ class BinanceAPIManager:
         origin_balance = self.get_currency_balance(origin_symbol)
         target_balance = self.get_currency_balance(target_symbol)
 
-        pair_info = self.binance_client.get_symbol_info(origin_symbol + target_symbol)
+        pair_info = self.get_symbol_info(origin_symbol + target_symbol)
         from_coin_price = self.get_ticker_price(origin_symbol + target_symbol)
         from_coin_price_s = "{:0.0{}f}".format(from_coin_price, pair_info["quotePrecision"])
 
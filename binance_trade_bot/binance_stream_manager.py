@@ -30,6 +30,7 @@ class BinanceOrder:  # pylint: disable=too-few-public-methods
 
 class BinanceCache:  # pylint: disable=too-few-public-methods
     ticker_values: Dict[str, float] = {}
+    ticker_values_updated: float = 0.0
     _balances: Dict[str, float] = {}
     _balances_mutex: threading.Lock = threading.Lock()
     non_existent_tickers: Set[str] = set()
@@ -181,8 +182,12 @@ class BinanceStreamManager:
                 for bal in stream_data["balances"]:
                     balances[bal["asset"]] = float(bal["free"])
         elif event_type == "24hrMiniTicker":
+            ticker_values = dict(self.cache.ticker_values)
             for event in stream_data["data"]:
-                self.cache.ticker_values[event["symbol"]] = float(event["close_price"])
+                ticker_values[event["symbol"]] = float(event["close_price"])
+            # swap the whole dict so readers never see a partially applied batch
+            self.cache.ticker_values = ticker_values
+            self.cache.ticker_values_updated = time.time()
         else:
             self.logger.error(f"Unknown event type found: {event_type}\n{stream_data}")
 
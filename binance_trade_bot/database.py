@@ -8,7 +8,9 @@ from typing import List, Optional, Union
 from socketio import Client
 from socketio.exceptions import ConnectionError as SocketIOConnectionError
 from sqlalchemy import create_engine, func
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .config import Config
 from .logger import Logger
@@ -19,10 +21,29 @@ class Database:
     def __init__(self, logger: Logger, config: Config, uri="sqlite:///data/crypto_trading.db"):
         self.logger = logger
         self.config = config
-        self.engine = create_engine(uri)
+        self.engine = self._create_engine(uri)
         self.SessionMaker = sessionmaker(bind=self.engine)
         self.socketio_client = Client()
 
+    @staticmethod
+    def _create_engine(uri: str):
+        """
+        Creates an engine that keeps a pool of open connections instead of connecting for every session.
+        """
+        url = make_url(uri)
+        if url.get_backend_name() != "sqlite":
+            return create_engine(uri, pool_size=10, max_overflow=20, pool_pre_ping=True, pool_recycle=3600)
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases only live as long as their connection, keep SQLAlchemy's default pool
+            return create_engine(uri)
+        return create_engine(
+            uri,
+            poolclass=QueuePool,
+            pool_size=10,
+            max_overflow=20,
+            connect_args={"check_same_thread": False},
+        )
+
     def socketio_connect(self):
         if self.socketio_client.connected and self.socketio_client.namespaces:
             return True
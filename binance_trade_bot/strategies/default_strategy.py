@@ -15,21 +15,23 @@ class Strategy(AutoTrader):
         Scout for potential jumps from the current coin to another coin
         """
         current_coin = self.db.get_current_coin()
+        current_coin_symbol = self.manager.get_bridge_symbol(current_coin)
         # Display on the console, the current coin+Bridge, so users can see *some* activity and not think the bot has
         # stopped. Not logging though to reduce log size.
         print(
             f"{datetime.now()} - CONSOLE - INFO - I am scouting the best trades. "
-            f"Current coin: {current_coin + self.config.BRIDGE} ",
+            f"Current coin: {current_coin_symbol} ",
             end="\r",
         )
 
-        current_coin_price = self.manager.get_ticker_price(current_coin + self.config.BRIDGE)
+        tickers = self._get_trade_tickers()
+        current_coin_price = tickers.get(current_coin_symbol)
 
         if current_coin_price is None:
-            self.logger.info(f"Skipping scouting... current coin {current_coin + self.config.BRIDGE} not found")
+            self.logger.info(f"Skipping scouting... current coin {current_coin_symbol} not found")
             return
 
-        self._jump_to_best_coin(current_coin, current_coin_price)
+        self._jump_to_best_coin(current_coin, current_coin_price, tickers)
 
     def bridge_scout(self):
         current_coin = self.db.get_current_coin()
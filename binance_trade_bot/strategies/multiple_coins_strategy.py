@@ -17,12 +17,15 @@ class Strategy(AutoTrader):
         if current_coin is not None:
             current_coin_symbol = current_coin.symbol
 
-        for coin in self.db.get_coins():
+        tickers = self._get_trade_tickers()
+
+        for coin in self._get_enabled_coins():
             current_coin_balance = self.manager.get_currency_balance(coin.symbol)
-            coin_price = self.manager.get_ticker_price(coin + self.config.BRIDGE)
+            coin_bridge_symbol = self.manager.get_bridge_symbol(coin)
+            coin_price = tickers.get(coin_bridge_symbol)
 
             if coin_price is None:
-                self.logger.info(f"Skipping scouting... current coin {coin + self.config.BRIDGE} not found")
+                self.logger.info(f"Skipping scouting... current coin {coin_bridge_symbol} not found")
                 continue
 
             min_notional = self.manager.get_min_notional(coin.symbol, self.config.BRIDGE.symbol)
@@ -36,11 +39,13 @@ class Strategy(AutoTrader):
             # has stopped. Not logging though to reduce log size.
             print(
                 f"{datetime.now()} - CONSOLE - INFO - I am scouting the best trades. "
-                f"Current coin: {coin + self.config.BRIDGE} ",
+                f"Current coin: {coin_bridge_symbol} ",
                 end="\r",
             )
 
-            self._jump_to_best_coin(coin, coin_price)
+            if self._jump_to_best_coin(coin, coin_price, tickers) is not None:
+                # The trade took time and refreshed the ratios, scout the remaining coins at current prices
+                tickers = self._get_trade_tickers()
 
         if not have_coin:
             self.bridge_scout()